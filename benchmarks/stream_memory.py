@@ -0,0 +1,109 @@
+"""
+Peak-memory benchmark for stream_indicators.py
+
+Generates a synthetic candle CSV of roughly --size-gb gigabytes, runs the
+streaming analysis on it in a child process and reports the child's peak
+RSS next to the input size. Run from the repository root:
+
+    python benchmarks/stream_memory.py --size-gb 2
+    python benchmarks/stream_memory.py --size-gb 2 --unsorted   # exercises clustering
+"""
+import numpy as np
+import pandas as pd
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DAYS_PER_TICKER = 2520      # ~10 years of trading days
+TICKERS_PER_BATCH = 200
+BYTES_PER_ROW = 60          # Approximate CSV row width for the synthetic data
+
+
+def _candle_batch(first_ticker, n_tickers, dates, rng):
+    """Random-walk OHLCV candles for n_tickers consecutive synthetic tickers"""
+    n_days = len(dates)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_tickers, n_days)), axis=1))
+    open_price = close * (1 + rng.normal(0, 0.01, close.shape))
+    high = np.maximum(open_price, close) * (1 + rng.uniform(0, 0.02, close.shape))
+    low = np.minimum(open_price, close) * (1 - rng.uniform(0, 0.02, close.shape))
+
+    return pd.DataFrame({
+        'Ticker': np.repeat([f'T{i:06d}' for i in range(first_ticker, first_ticker + n_tickers)], n_days),
+        'Date': np.tile(dates, n_tickers),
+        'Open': open_price.ravel().round(4),
+        'High': high.ravel().round(4),
+        'Low': low.ravel().round(4),
+        'Close': close.ravel().round(4),
+        'Volume': rng.integers(10_000, 10_000_000, close.size),
+    })
+
+
+def write_synthetic_candles(path, size_gb, unsorted=False, seed=0):
+    """Write a synthetic candle file; unsorted interleaves tickers by date"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end='2026-01-01', periods=DAYS_PER_TICKER).strftime('%Y-%m-%d')
+    n_tickers = max(1, int(size_gb * 1e9 / BYTES_PER_ROW / DAYS_PER_TICKER))
+
+    header = True
+    for first in range(0, n_tickers, TICKERS_PER_BATCH):
+        batch = _candle_batch(first, min(TICKERS_PER_BATCH, n_tickers - first), dates, rng)
+        if unsorted:
+            batch = batch.sort_values('Date', kind='stable')
+        batch.to_csv(path, mode='w' if header else 'a', header=header, index=False)
+        header = False
+
+    return n_tickers
+
+
+def run_child(candle_file, work_dir, chunk_rows):
+    """Child process: point the streaming outputs at work_dir and run"""
+    import stream_indicators
+
+    finviz_file = os.path.join(work_dir, 'FinVizData.csv')
+    pd.DataFrame({'Ticker': ['T000000'], 'Price': [50.0]}).to_csv(finviz_file, index=False)
+    stream_indicators.FINVIZ_FILE = finviz_file
+    stream_indicators.ENGULFING_FILE = os.path.join(work_dir, 'engulfing.csv')
+    stream_indicators.MOMENTUM_FILE = os.path.join(work_dir, 'momentum.csv')
+    stream_indicators.run_streaming_analysis(candle_file, chunk_rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size-gb', type=float, default=2.0, help="Approximate synthetic input size")
+    parser.add_argument('--chunk-rows', type=int, default=500_000, help="Rows per streaming chunk")
+    parser.add_argument('--unsorted', action='store_true', help="Interleave tickers to force clustering")
+    parser.add_argument('--child', nargs=2, metavar=('CANDLES', 'WORK_DIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], args.child[1], args.chunk_rows)
+        return
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        candle_file = os.path.join(work_dir, 'candles.csv')
+        start = time.time()
+        n_tickers = write_synthetic_candles(candle_file, args.size_gb, args.unsorted)
+        input_mb = os.path.getsize(candle_file) / 1e6
+        print(f"Generated {input_mb:,.0f} MB ({n_tickers} tickers) in {time.time() - start:.0f}s")
+
+        start = time.time()
+        subprocess.run(
+            [sys.executable, __file__, '--chunk-rows', str(args.chunk_rows), '--child', candle_file, work_dir],
+            check=True, cwd=ROOT
+        )
+        peak_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024    # ru_maxrss is KB on Linux
+        results = sum(1 for _ in open(os.path.join(work_dir, 'engulfing.csv'))) - 1
+
+        print(f"Streamed {results} tickers in {time.time() - start:.0f}s")
+        print(f"Input size: {input_mb:,.0f} MB | Peak RSS: {peak_mb:,.0f} MB | Chunk rows: {args.chunk_rows:,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 import pandas as pd 
+import numpy as np
 import logging
 
 # Set up logging
@@ -7,6 +8,161 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+# === CANDLE PATTERN LIBRARY ===
+
+# Bit position of each pattern in the Pattern_Mask column (bit i = 1 << i)
+CANDLE_PATTERNS = [
+    'Doji',
+    'Hammer',
+    'Shooting_Star',
+    'Bullish_Engulfing',
+    'Bearish_Engulfing',
+    'Bullish_Harami',
+    'Bearish_Harami',
+    'Morning_Star',
+    'Evening_Star',
+    'Three_White_Soldiers',
+    'Three_Black_Crows',
+]
+PATTERN_BITS = {name: 1 << i for i, name in enumerate(CANDLE_PATTERNS)}
+
+# Thresholds expressed as fractions of the candle range / body
+DOJI_BODY_RATIO = 0.1       # Body <= 10% of range
+SHADOW_BODY_RATIO = 2.0     # Long shadow >= 2x body (hammer / shooting star)
+SMALL_SHADOW_RATIO = 0.1    # Opposite shadow <= 10% of range
+LONG_BODY_RATIO = 0.5       # Body >= 50% of range counts as a long candle
+STAR_BODY_RATIO = 0.3       # Star body <= 30% of the first candle's body
+
+# Shared with Revsignal1 so both engulfing definitions agree
+ENGULFING_BODY_MIN = 0.003  # Minimum body size for both engulfing candles
+
+# Trailing window (calendar days) for the *_Count_90d summary columns
+COUNT_WINDOW_DAYS = 90
+
+
+def compute_candle_features(df, group_col='Ticker'):
+    """
+    Precompute per-bar candle features shared by every pattern
+    Expects df sorted by group_col then Date; lagged copies (_1, _2)
+    are shifted within each ticker so bars never leak across symbols
+    """
+    open_price = df['Open']
+    close = df['Close']
+    top = np.maximum(open_price, close)
+    bottom = np.minimum(open_price, close)
+
+    features = pd.DataFrame({
+        'open': open_price,
+        'close': close,
+        'body': (close - open_price).abs(),
+        'range': df['High'] - df['Low'],
+        'upper_shadow': df['High'] - top,
+        'lower_shadow': bottom - df['Low'],
+        'direction': np.sign(close - open_price),
+    }, index=df.index)
+
+    grouped = features.groupby(df[group_col], sort=False)
+    lagged = [grouped.shift(lag).add_suffix(f'_{lag}') for lag in (1, 2)]
+
+    return pd.concat([features] + lagged, axis=1)
+
+
+def detect_candle_patterns(df, group_col='Ticker'):
+    """
+    Evaluate every pattern in CANDLE_PATTERNS in one vectorized pass
+    Returns: integer Series bitmask per bar (see PATTERN_BITS)
+    """
+    f = compute_candle_features(df, group_col)
+
+    body, rng = f['body'], f['range']
+    bullish, bearish = f['direction'] > 0, f['direction'] < 0
+    bullish_1, bearish_1 = f['direction_1'] > 0, f['direction_1'] < 0
+    bullish_2, bearish_2 = f['direction_2'] > 0, f['direction_2'] < 0
+    has_range = rng > 0
+    doji = has_range & (body <= DOJI_BODY_RATIO * rng)
+    long_body_2 = f['body_2'] >= LONG_BODY_RATIO * f['range_2']
+    small_body_1 = f['body_1'] <= STAR_BODY_RATIO * f['body_2']
+    midpoint_2 = (f['open_2'] + f['close_2']) / 2
+    engulfing_bodies = (body > ENGULFING_BODY_MIN) & (f['body_1'] > ENGULFING_BODY_MIN)
+
+    conditions = {
+        'Doji': doji,
+        'Hammer': (
+            has_range & ~doji &
+            (f['lower_shadow'] >= SHADOW_BODY_RATIO * body) &
+            (f['upper_shadow'] <= SMALL_SHADOW_RATIO * rng)
+        ),
+        'Shooting_Star': (
+            has_range & ~doji &
+            (f['upper_shadow'] >= SHADOW_BODY_RATIO * body) &
+            (f['lower_shadow'] <= SMALL_SHADOW_RATIO * rng)
+        ),
+        'Bullish_Engulfing': (
+            engulfing_bodies & bearish_1 & bullish &
+            (f['open'] <= f['close_1']) &
+            (f['close'] >= f['open_1'])
+        ),
+        'Bearish_Engulfing': (
+            engulfing_bodies & bullish_1 & bearish &
+            (f['open'] >= f['close_1']) &
+            (f['close'] <= f['open_1'])
+        ),
+        'Bullish_Harami': (
+            bearish_1 & bullish & (body < f['body_1']) &
+            (f['open'] >= f['close_1']) &
+            (f['close'] <= f['open_1'])
+        ),
+        'Bearish_Harami': (
+            bullish_1 & bearish & (body < f['body_1']) &
+            (f['open'] <= f['close_1']) &
+            (f['close'] >= f['open_1'])
+        ),
+        'Morning_Star': (
+            bearish_2 & long_body_2 & small_body_1 &
+            bullish & (f['close'] > midpoint_2)
+        ),
+        'Evening_Star': (
+            bullish_2 & long_body_2 & small_body_1 &
+            bearish & (f['close'] < midpoint_2)
+        ),
+        'Three_White_Soldiers': (
+            bullish & bullish_1 & bullish_2 &
+            (f['close'] > f['close_1']) & (f['close_1'] > f['close_2']) &
+            f['open'].between(f['open_1'], f['close_1']) &
+            f['open_1'].between(f['open_2'], f['close_2'])
+        ),
+        'Three_Black_Crows': (
+            bearish & bearish_1 & bearish_2 &
+            (f['close'] < f['close_1']) & (f['close_1'] < f['close_2']) &
+            f['open'].between(f['close_1'], f['open_1']) &
+            f['open_1'].between(f['close_2'], f['open_2'])
+        ),
+    }
+
+    mask = np.zeros(len(df), dtype=np.int64)
+    for name, condition in conditions.items():
+        mask |= condition.to_numpy(dtype=bool) * PATTERN_BITS[name]
+
+    return pd.Series(mask, index=df.index, name='Pattern_Mask')
+
+
+def decode_pattern_mask(mask):
+    """Return the list of pattern names set in a Pattern_Mask value"""
+    return [name for name, bit in PATTERN_BITS.items() if int(mask) & bit]
+
+
+def summarize_pattern_mask(mask_series):
+    """
+    Summarize a ticker's Pattern_Mask history
+    Returns: (latest flags dict, counts dict) keyed by pattern name
+    """
+    masks = mask_series.to_numpy(dtype=np.int64)
+    latest = masks[-1] if len(masks) else 0
+    flags = {name: int(bool(latest & bit)) for name, bit in PATTERN_BITS.items()}
+    counts = {name: int(((masks & bit) != 0).sum()) for name, bit in PATTERN_BITS.items()}
+    return flags, counts
+
+
 # === FUNCTIONS (importable) ===
 
 def Revsignal1(df1):
@@ -22,8 +178,8 @@ def Revsignal1(df1):
     signal = [0]*length
     bodydiff = [0]*length
 
-    # Minimum body size threshold (0.3% of price)
-    bodydiffmin = 0.003
+    # Minimum body size threshold
+    bodydiffmin = ENGULFING_BODY_MIN
 
     for row in range(1, length):
         bodydiff[row] = abs(open_price[row] - close[row])
@@ -58,10 +214,19 @@ def analyze_ticker_patterns(symbol, stock_data_df):
         ticker_df = ticker_df.sort_values('Date').reset_index(drop=True)
         ticker_df['Signal'] = Revsignal1(ticker_df)
 
+        # Reuse the panel-wide mask when the caller already computed it
+        if 'Pattern_Mask' not in ticker_df.columns:
+            ticker_df['Pattern_Mask'] = detect_candle_patterns(ticker_df)
+
+        # Counts cover a fixed trailing window however much history is loaded
+        dates = pd.to_datetime(ticker_df['Date'])
+        window_df = ticker_df[dates > dates.iloc[-1] - pd.Timedelta(days=COUNT_WINDOW_DAYS)]
+        pattern_flags, pattern_counts = summarize_pattern_mask(window_df['Pattern_Mask'])
+
         latest_signal = ticker_df['Signal'].iloc[-1]
         latest_date = ticker_df['Date'].iloc[-1]
-        bearish_count = (ticker_df['Signal'] == 1).sum()
-        bullish_count = (ticker_df['Signal'] == 2).sum()
+        bearish_count = (window_df['Signal'] == 1).sum()
+        bullish_count = (window_df['Signal'] == 2).sum()
         latest_close = ticker_df['Close'].iloc[-1]
 
         return {
@@ -71,6 +236,9 @@ def analyze_ticker_patterns(symbol, stock_data_df):
             'Bearish_Count': bearish_count,
             'Bullish_Count': bullish_count,
             'Latest_Close': latest_close,
+            'Latest_Pattern_Mask': int(ticker_df['Pattern_Mask'].iloc[-1]),
+            'Pattern_Flags': pattern_flags,
+            'Pattern_Counts': pattern_counts,
             'Data': ticker_df
         }
 
@@ -78,6 +246,37 @@ def analyze_ticker_patterns(symbol, stock_data_df):
         logging.warning(f"Error analyzing {symbol}: {str(e)}")
         return None 
 
+def build_pattern_table(stock_data):
+    """
+    Build one summary row per ticker for a candle panel
+    Used for the whole file and for each chunk in streaming mode
+    """
+    # Evaluate the full pattern library once over the whole panel
+    stock_data = stock_data.sort_values(['Ticker', 'Date']).reset_index(drop=True)
+    stock_data['Pattern_Mask'] = detect_candle_patterns(stock_data)
+
+    results = []
+    for symbol, ticker_df in stock_data.groupby('Ticker', sort=False):
+        result = analyze_ticker_patterns(symbol, ticker_df)
+        if result:
+            row = {
+                'Ticker': result['Ticker'],
+                'Latest_Signal': result['Latest_Signal'],
+                'Latest_Signal_Name': {0: 'Neutral', 1: 'Bearish', 2: 'Bullish'}[result['Latest_Signal']],
+                'Latest_Date': result['Latest_Date'],
+                'Bearish_Count_90d': result['Bearish_Count'],
+                'Bullish_Count_90d': result['Bullish_Count'],
+                'Latest_Close': result['Latest_Close'],
+                'Latest_Pattern_Mask': result['Latest_Pattern_Mask'],
+                'Latest_Patterns': ', '.join(decode_pattern_mask(result['Latest_Pattern_Mask'])) or 'Neutral',
+            }
+            for name in CANDLE_PATTERNS:
+                row[f'{name}_Latest'] = result['Pattern_Flags'][name]
+                row[f'{name}_Count_90d'] = result['Pattern_Counts'][name]
+            results.append(row)
+
+    return pd.DataFrame(results)
+
 def run_engulfing_analysis():
     """Main analysis workflow"""
     # Load FinViz data
@@ -91,26 +290,9 @@ def run_engulfing_analysis():
         logging.error("saved_data/stock_candles_90d.csv not found")
         exit(1)
 
-    # Get symbol list from candle data
-    symbol_list = stock_data['Ticker'].unique().tolist()
-
-    logging.info(f"Analyzing {len(symbol_list)} tickers for engulfing patterns")
-
-    results = []
-    for symbol in symbol_list:
-        result = analyze_ticker_patterns(symbol, stock_data)
-        if result:
-            results.append({
-                'Ticker': result['Ticker'],
-                'Latest_Signal': result['Latest_Signal'],
-                'Latest_Signal_Name': {0: 'Neutral', 1: 'Bearish', 2: 'Bullish'}[result['Latest_Signal']],
-                'Latest_Date': result['Latest_Date'],
-                'Bearish_Count_90d': result['Bearish_Count'],
-                'Bullish_Count_90d': result['Bullish_Count'],
-                'Latest_Close': result['Latest_Close']
-            })
+    logging.info(f"Analyzing {stock_data['Ticker'].nunique()} tickers for engulfing patterns")
 
-    pattern_df = pd.DataFrame(results).sort_values(['Latest_Signal', 'Latest_Close'], ascending=False)
+    pattern_df = build_pattern_table(stock_data).sort_values(['Latest_Signal', 'Latest_Close'], ascending=False)
 
     # Merge FinViz data onto pattern results
     merged_df = pattern_df.merge(
@@ -121,7 +303,7 @@ def run_engulfing_analysis():
 
     # Save to CSV
     merged_df.to_csv('saved_data/FinVizData_with_engulfing_patterns.csv', index=False)
-    logging.info(f"Saved {len(results)} results to FinVizData_with_engulfing_patterns.csv")
+    logging.info(f"Saved {len(pattern_df)} results to FinVizData_with_engulfing_patterns.csv")
 
 # === MAIN ENTRY POINT ===
 if __name__ == "__main__":
@@ -104,6 +104,20 @@ def analyze_ticker_momentum(symbol, stock_data_df):
         return None
 
 
+def build_momentum_table(stock_data):
+    """
+    Build one momentum summary row per ticker for a candle panel
+    Expects lowercase column names; used for the whole file and for each chunk in streaming mode
+    """
+    results = []
+    for symbol, ticker_df in stock_data.groupby('ticker', sort=False):
+        result = analyze_ticker_momentum(symbol, ticker_df)
+        if result:
+            results.append(result)
+
+    return pd.DataFrame(results)
+
+
 def run_momentum_analysis():
     """Main analysis workflow"""
     # Load FinViz data
@@ -118,18 +132,9 @@ def run_momentum_analysis():
         logging.error("saved_data/stock_candles_90d.csv not found")
         exit(1)
 
-    # Get symbol list from candle data
-    symbol_list = stock_data['ticker'].unique().tolist()
-
-    logging.info(f"Analyzing {len(symbol_list)} tickers for momentum indicators")
-
-    results = []
-    for symbol in symbol_list:
-        result = analyze_ticker_momentum(symbol, stock_data)
-        if result:
-            results.append(result)
+    logging.info(f"Analyzing {stock_data['ticker'].nunique()} tickers for momentum indicators")
 
-    momentum_df = pd.DataFrame(results)
+    momentum_df = build_momentum_table(stock_data)
 
     # Merge with FinViz data
     merged_df = momentum_df.merge(
@@ -140,7 +145,7 @@ def run_momentum_analysis():
 
     # Save to CSV
     merged_df.to_csv('saved_data/FinVizData_with_momentum_indicators.csv', index=False)
-    logging.info(f"Saved {len(results)} results to FinVizData_with_momentum_indicators.csv")
+    logging.info(f"Saved {len(momentum_df)} results to FinVizData_with_momentum_indicators.csv")
 
 
 # === MAIN ENTRY POINT ===
@@ -0,0 +1,2 @@
+from .cache import ResponseCache, CACHE_MODES
+from .market_data import MarketDataProvider
\ No newline at end of file
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+# Configuration (overridable through the environment)
+CACHE_DIR = os.environ.get('DAILY_FIN_CACHE_DIR', '.cache/market_data')
+CACHE_TTL = int(os.environ.get('DAILY_FIN_CACHE_TTL', 12 * 3600))                 # Seconds
+CACHE_MAX_BYTES = int(os.environ.get('DAILY_FIN_CACHE_MAX_MB', 1024)) * 1024 ** 2
+CACHE_MODE = os.environ.get('DAILY_FIN_CACHE_MODE', 'cache')
+EVICT_TARGET = 0.9      # Evict down to this fraction of the size bound, so evictions are batched
+
+# live   - always fetch, never touch the cache
+# cache  - serve fresh entries (younger than the TTL), fetch and store misses
+# record - always fetch and overwrite the cache
+# replay - serve only from the cache regardless of age; misses are errors
+CACHE_MODES = ('live', 'cache', 'record', 'replay')
+
+
+class ResponseCache:
+    """
+    Content-addressed on-disk response cache
+    Entries are keyed by a hash of the request, expire after ttl seconds
+    and are evicted least-recently-used once the cache exceeds max_bytes.
+    The total size is scanned once and then tracked on put, so the directory
+    is only walked again when an eviction is due.
+    An entry's mtime is its write time (TTL) and its atime its last read (LRU).
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES, mode=CACHE_MODE):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode '{mode}', expected one of {CACHE_MODES}")
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        if mode != 'live':
+            os.makedirs(cache_dir, exist_ok=True)
+            # Scan once; put() keeps the running total from here on
+            self._total_bytes = sum(size for _, size, _ in self._scan())
+
+    @staticmethod
+    def key(namespace, request):
+        """Hash a namespace and JSON-serializable request into a cache key"""
+        payload = json.dumps([namespace, request], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, key):
+        """Return cached bytes for key, or None if missing or expired"""
+        if self.mode in ('live', 'record'):
+            return None
+
+        path = self._path(key)
+        try:
+            stat = os.stat(path)
+            now = time.time()
+            if self.mode == 'cache' and now - stat.st_mtime > self.ttl:
+                return None
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path, (now, stat.st_mtime))    # Mark as recently used, keep write time
+            return data
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, data):
+        """Store bytes under key, evicting least-recently-used entries once over the size bound"""
+        if self.mode in ('live', 'replay'):
+            return
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+
+        with self._lock:
+            try:
+                self._total_bytes -= os.path.getsize(path)    # Overwriting an existing entry
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, path)
+            self._total_bytes += len(data)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        """Return (atime, size, path) for every cache entry"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_atime, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        """Delete least-recently-used entries down to EVICT_TARGET of max_bytes (caller holds the lock)"""
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_TARGET
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                continue
+            logging.debug(f"Evicted cache entry {os.path.basename(path)}")
+        self._total_bytes = total
+
+    def evict(self):
+        """Delete least-recently-used entries until the cache fits in max_bytes"""
+        with self._lock:
+            self._evict()
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+
+from .cache import ResponseCache
+
+# Configuration
+MAX_CONCURRENCY = 4
+
+
+class MarketDataProvider:
+    """
+    Fan-out fetcher for market data with an on-disk response cache
+    Blocking fetch functions (yfinance, requests) run in worker threads,
+    at most max_concurrency at a time; responses are cached as bytes.
+    """
+
+    def __init__(self, cache=None, max_concurrency=MAX_CONCURRENCY):
+        self.cache = cache if cache is not None else ResponseCache()
+        self.max_concurrency = max_concurrency
+
+    async def _fetch_one(self, namespace, request, fetch, semaphore):
+        key = ResponseCache.key(namespace, request)
+        data = self.cache.get(key)
+        if data is not None:
+            return data
+        if self.cache.mode == 'replay':
+            raise LookupError(f"No recorded {namespace} response for {request}")
+
+        async with semaphore:
+            return await asyncio.to_thread(self._fetch_and_store, key, request, fetch)
+
+    def _fetch_and_store(self, key, request, fetch):
+        """Worker-thread body: fetch, then write the cache entry off the event loop"""
+        data = fetch(request)
+        self.cache.put(key, data)
+        return data
+
+    def _fetch_batch_and_store(self, namespace, batch, fetch_batch, params):
+        """Worker-thread body: fetch a batch, then cache each item it returned"""
+        batch_result = fetch_batch(batch, params)
+        for item in batch:
+            if item in batch_result:
+                self.cache.put(ResponseCache.key(namespace, {'item': item, **params}), batch_result[item])
+        return batch_result
+
+    async def afetch_many(self, namespace, requests, fetch):
+        """
+        Fetch every request concurrently, serving cached responses where possible
+        fetch(request) -> bytes runs in a worker thread on cache misses.
+        Returns: list aligned with requests holding bytes or the raised exception
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = [self._fetch_one(namespace, request, fetch, semaphore) for request in requests]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    def fetch_many(self, namespace, requests, fetch):
+        """Blocking wrapper around afetch_many for the pipeline scripts"""
+        results = asyncio.run(self.afetch_many(namespace, requests, fetch))
+        failures = sum(isinstance(result, Exception) for result in results)
+        if failures:
+            logging.warning(f"{failures}/{len(results)} {namespace} requests failed")
+        return results
+
+    async def afetch_batched(self, namespace, items, fetch_batch, batch_size, params=None, max_concurrency=None):
+        """
+        Cache per item but fetch misses in batches (e.g. tickers per yf.download call)
+        fetch_batch(batch, params) -> {item: bytes} runs in a worker thread;
+        items it leaves out count as failed and are not cached, so a re-run
+        refetches only those. params are part of every item's cache key.
+        Returns: list aligned with items holding bytes or an exception
+        """
+        params = params or {}
+        results = {}
+        misses = []
+        for item in items:
+            data = self.cache.get(ResponseCache.key(namespace, {'item': item, **params}))
+            if data is not None:
+                results[item] = data
+            elif self.cache.mode == 'replay':
+                results[item] = LookupError(f"No recorded {namespace} response for {item}")
+            else:
+                misses.append(item)
+
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def run(batch):
+            async with semaphore:
+                return await asyncio.to_thread(self._fetch_batch_and_store, namespace, batch, fetch_batch, params)
+
+        batches = [misses[i:i + batch_size] for i in range(0, len(misses), batch_size)]
+        fetched = await asyncio.gather(*(run(batch) for batch in batches), return_exceptions=True)
+
+        for batch, batch_result in zip(batches, fetched):
+            for item in batch:
+                if isinstance(batch_result, Exception):
+                    results[item] = batch_result
+                elif item in batch_result:
+                    results[item] = batch_result[item]
+                else:
+                    results[item] = LookupError(f"No {namespace} data returned for {item}")
+
+        return [results[item] for item in items]
+
+    def fetch_batched(self, namespace, items, fetch_batch, batch_size, params=None, max_concurrency=None):
+        """Blocking wrapper around afetch_batched for the pipeline scripts"""
+        results = asyncio.run(
+            self.afetch_batched(namespace, items, fetch_batch, batch_size, params, max_concurrency)
+        )
+        failures = sum(isinstance(result, Exception) for result in results)
+        if failures:
+            logging.warning(f"{failures}/{len(results)} {namespace} items failed")
+        return results
+
+    def fetch(self, namespace, request, fetch):
+        """Fetch a single request; raises if it fails"""
+        result = self.fetch_many(namespace, [request], fetch)[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
@@ -2,6 +2,9 @@ import pandas as pd
 import yfinance as yf
 from datetime import datetime, timedelta
 import logging
+from io import BytesIO
+
+from providers import MarketDataProvider
 
 # Set up logging
 logging.basicConfig(
@@ -12,49 +15,99 @@ logging.basicConfig(
 # Configuration
 DAYS_TO_PULL = 90
 ADDITIONAL_TICKERS = ['AMAT', 'AAPL', 'FSMD']
+BATCH_SIZE = 200
+
+def download_batch(symbols, params):
+    """
+    Download one batch of tickers from yfinance (provider batch function)
+    
+    yf.download keeps its results in module-global state, so batches must
+    not run concurrently; yfinance parallelises tickers within the call.
+    
+    Args:
+        symbols: List of stock ticker symbols in this batch
+        params: dict with 'days' of history to pull, ending today
+        
+    Returns:
+        dict of ticker -> long-format candles as CSV bytes; tickers that
+        came back empty (rate limited, delisted) are left out so they are
+        not cached and get refetched on the next run
+    """
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=params['days'])
+
+    df = yf.download(
+        symbols, 
+        start=start_date, 
+        end=end_date, 
+        progress=False, 
+        auto_adjust=True,
+        group_by='column',
+        multi_level_index=True,     # Keep (field, ticker) columns even for a one-ticker batch
+        threads=True
+    )
+    
+    if df.empty:
+        raise ValueError(f"No data returned from yfinance for {len(symbols)} tickers")
+        
+    # Stack to convert from wide to long format
+    df = df.stack(level=1, future_stack=True).reset_index()
+    df.rename(columns={'level_1': 'Ticker'}, inplace=True)
+
+    # Standardize column names
+    df.columns = [col.capitalize() if col.lower() != 'ticker' else 'Ticker'
+                  for col in df.columns]
+
+    # Reorder columns for clarity
+    column_order = ['Ticker', 'Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+    df = df[[col for col in column_order if col in df.columns]]
+
+    # Split per ticker, dropping tickers yfinance failed on (all-NaN closes)
+    return {
+        ticker: ticker_df.to_csv(index=False).encode()
+        for ticker, ticker_df in df.groupby('Ticker', sort=False)
+        if ticker_df['Close'].notna().any()
+    }
 
-def pull_all_stock_data(symbol_list, days=90):
+
+def pull_all_stock_data(symbol_list, days=90, provider=None):
     """
-    Download historical stock data for multiple tickers in batch (avoids rate limiting)
+    Download historical stock data for multiple tickers in batches
+    
+    Candles are cached per ticker (keyed on ticker and days, not on dates,
+    so recorded runs replay on later days); only uncached or previously
+    failed tickers are downloaded, one batch at a time.
     
     Args:
         symbol_list: List of stock ticker symbols
         days: Number of days of historical data (default: 90)
+        provider: MarketDataProvider (default: cache settings from the environment)
         
     Returns:
         DataFrame with all ticker data in long format
     """
     try:
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
+        provider = provider or MarketDataProvider()
         
-        # Download ALL tickers at once - this avoids rate limiting!
-        df = yf.download(
-            symbol_list, 
-            start=start_date, 
-            end=end_date, 
-            progress=False, 
-            auto_adjust=True,
-            group_by='column'
+        # Large batches keep the number of yfinance calls low (avoids rate limiting)
+        symbols = sorted(symbol_list)
+        results = provider.fetch_batched(
+            'yfinance', symbols, download_batch, BATCH_SIZE,
+            params={'days': days}, max_concurrency=1
         )
         
-        if df.empty:
+        frames = []
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logging.error(f"Error downloading {symbol}: {str(result)}")
+                continue
+            frames.append(pd.read_csv(BytesIO(result)))
+        
+        if not frames:
             logging.warning("No data returned from yfinance")
             return None
-            
-        # Stack to convert from wide to long format
-        df = df.stack(level=1, future_stack=True).reset_index()
-        df.rename(columns={'level_1': 'Ticker'}, inplace=True)
-
-        # Standardize column names
-        df.columns = [col.capitalize() if col.lower() != 'ticker' else 'Ticker'
-                      for col in df.columns]
-
-        # Reorder columns for clarity
-        column_order = ['Ticker', 'Date', 'Open', 'High', 'Low', 'Close', 'Volume']
-        df = df[[col for col in column_order if col in df.columns]]
 
-        return df
+        return pd.concat(frames, ignore_index=True)
         
     except Exception as e:
         logging.error(f"Error downloading data: {str(e)}")
@@ -80,7 +133,7 @@ def main():
         logging.error(f"Error reading FinVizData.csv: {str(e)}")
         return
     
-    # Batch download - single API call for all tickers
+    # Batch download - one API call per batch of tickers
     combined_df = pull_all_stock_data(symbol_list, days=DAYS_TO_PULL)
     
     # Save results
@@ -4,9 +4,15 @@ import pandas as pd
 from datetime import datetime
 from io import StringIO
 import time
+from functools import partial
 import logging
 import os
 
+from providers import MarketDataProvider
+
+# keep concurrent page requests low to avoid rate limiting
+MAX_CONCURRENT_PAGES = 2
+
 # set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -42,35 +48,47 @@ def get_total_pages(soup):
         logging.error(f"Error getting total pages: {str(e)}")
         return 1
 
-def get_webpage(url, csv_file, delay=1):
-    """Scrape data from FinViz and save to CSV"""
+def fetch_page(request, delay=0):
+    """Download one screener page (provider fetch function)"""
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
     }
+    response = requests.get(request['url'], headers=headers)
+    response.raise_for_status()  # raise an exception for bad status codes
+
+    # add delay between requests to avoid rate limiting
+    time.sleep(delay)
+    return response.content
+
+def get_webpage(url, csv_file, delay=1, provider=None):
+    """Scrape data from FinViz and save to CSV"""
+    provider = provider or MarketDataProvider(max_concurrency=MAX_CONCURRENT_PAGES)
 
     try:
         # initial connection to get total pages
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # raise an exception for bad status codes
+        content = provider.fetch('finviz', {'url': url}, fetch_page)
 
-        soup = BeautifulSoup(response.content, 'lxml')
+        soup = BeautifulSoup(content, 'lxml')
         num_pages = get_total_pages(soup)
         logging.info(f"Found {num_pages} pages to scrape")
 
+        # fan out over every page; cached pages are served from disk
+        # the delay is bound to the fetch function so it stays out of the cache key
+        page_requests = [{'url': url + f"&r={page * 20 + 1}"} for page in range(num_pages)]
+        pages = provider.fetch_many('finviz', page_requests, partial(fetch_page, delay=delay))
+
         # collect all data before writing
         all_data = []
         
-        ticker_number = 1
-        for page in range(num_pages):
+        for page, content in enumerate(pages):
             try:
-                logging.info(f"Scraping page {page + 1}/{num_pages}")
+                logging.info(f"Parsing page {page + 1}/{num_pages}")
 
-                # visit each page and convert into pandas data
-                page_url = url + f"&r={ticker_number}"
-                response = requests.get(page_url, headers=headers)
-                response.raise_for_status()
+                if isinstance(content, Exception):
+                    raise content
 
-                soup = BeautifulSoup(response.content, 'lxml')
+                # convert each page into pandas data
+                soup = BeautifulSoup(content, 'lxml')
                 table = soup.find('table', class_='styled-table-new is-rounded is-tabular-nums w-full screener_table')
 
                 if table is None:
@@ -82,10 +100,6 @@ def get_webpage(url, csv_file, delay=1):
                 
                 # collect data from this page
                 all_data.append(pd_data[0])
-                ticker_number += 20
-
-                # add delay between requests to avoid rate limiting
-                time.sleep(delay)
 
             except Exception as e:
                 logging.error(f"Error processing page {page + 1}: {str(e)}")
@@ -0,0 +1,181 @@
+import pandas as pd
+import argparse
+import logging
+import math
+import os
+import tempfile
+
+from engulfing_indicator import build_pattern_table
+from momentum_indicator import build_momentum_table
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Configuration
+CANDLE_FILE = 'saved_data/stock_candles_90d.csv'
+FINVIZ_FILE = 'saved_data/FinVizData.csv'
+ENGULFING_FILE = 'saved_data/FinVizData_with_engulfing_patterns.csv'
+MOMENTUM_FILE = 'saved_data/FinVizData_with_momentum_indicators.csv'
+CHUNK_ROWS = 500_000        # Candle rows read per chunk
+ROW_SAMPLE_LINES = 1000     # Lines sampled to estimate the average CSV row width
+
+# === FUNCTIONS (importable) ===
+
+def is_grouped_by_ticker(csv_file, chunk_rows=CHUNK_ROWS):
+    """Check that every ticker's rows are contiguous, reading only the Ticker column"""
+    seen = set()
+    last = None
+    with pd.read_csv(csv_file, usecols=['Ticker'], chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            # Start of each run of identical tickers within the chunk
+            tickers = chunk['Ticker']
+            runs = tickers[tickers.ne(tickers.shift())].tolist()
+            if runs and runs[0] == last:
+                runs = runs[1:]
+            for ticker in runs:
+                if ticker in seen:
+                    return False
+                seen.add(ticker)
+            if len(tickers):
+                last = tickers.iloc[-1]
+    return True
+
+
+def cluster_bucket_count(csv_file, chunk_rows=CHUNK_ROWS):
+    """Number of spill files needed for each to hold about chunk_rows rows"""
+    with open(csv_file, 'rb') as f:
+        next(f, None)   # Header
+        sample = [len(line) for _, line in zip(range(ROW_SAMPLE_LINES), f)]
+    if not sample:
+        return 1
+    row_bytes = sum(sample) / len(sample)
+    return max(1, math.ceil(os.path.getsize(csv_file) / (row_bytes * chunk_rows)))
+
+
+def cluster_by_ticker(csv_file, output_file, chunk_rows=CHUNK_ROWS, buckets=None):
+    """
+    Rewrite csv_file so each ticker's rows are contiguous and date-ordered
+    Rows are hash-partitioned by ticker into spill files sized to about
+    chunk_rows rows each, then each spill file is sorted on its own, so peak
+    memory follows the chunk size rather than the file size
+    """
+    buckets = buckets or cluster_bucket_count(csv_file, chunk_rows)
+    logging.info(f"Clustering {csv_file} into {buckets} spill files")
+
+    with tempfile.TemporaryDirectory() as spill_dir:
+        spill_files = [os.path.join(spill_dir, f'bucket_{i}.csv') for i in range(buckets)]
+        header = None
+
+        with pd.read_csv(csv_file, chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                header = list(chunk.columns)
+                bucket_ids = pd.util.hash_pandas_object(chunk['Ticker'], index=False) % buckets
+                for bucket_id, part in chunk.groupby(bucket_ids.to_numpy()):
+                    part.to_csv(spill_files[bucket_id], mode='a', header=False, index=False)
+
+        pd.DataFrame(columns=header).to_csv(output_file, index=False)
+        for spill_file in spill_files:
+            if not os.path.exists(spill_file):
+                continue
+            part = pd.read_csv(spill_file, header=None, names=header)
+            part = part.sort_values(['Ticker', 'Date'], kind='stable')
+            part.to_csv(output_file, mode='a', header=False, index=False)
+
+
+def iter_ticker_chunks(csv_file, chunk_rows=CHUNK_ROWS):
+    """
+    Yield DataFrames of whole tickers from a ticker-grouped candle file
+    The trailing ticker of each read is carried into the next one so no
+    ticker is split across chunks; a chunk grows past chunk_rows only when
+    a single ticker is longer than that
+    """
+    carry = None
+    with pd.read_csv(csv_file, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            if carry is not None:
+                chunk = pd.concat([carry, chunk], ignore_index=True)
+            if chunk.empty:
+                continue
+
+            trailing = chunk['Ticker'].eq(chunk['Ticker'].iloc[-1])
+            carry = chunk[trailing]
+            complete = chunk[~trailing]
+            if not complete.empty:
+                yield complete
+
+    if carry is not None and not carry.empty:
+        yield carry
+
+
+def stream_indicator_tables(chunks):
+    """Yield (engulfing table, momentum table) for each candle chunk"""
+    for chunk in chunks:
+        chunk['Date'] = pd.to_datetime(chunk['Date'])
+        pattern_df = build_pattern_table(chunk)
+
+        chunk.columns = chunk.columns.str.lower()
+        momentum_df = build_momentum_table(chunk)
+
+        yield pattern_df, momentum_df
+
+
+def _append_results(df, finviz_df, output_file, write_header):
+    """Merge a chunk's results onto FinViz data and append them to output_file"""
+    if df.empty:
+        return write_header
+    merged_df = df.merge(finviz_df, on='Ticker', how='left')
+    merged_df.to_csv(output_file, mode='a', header=write_header, index=False)
+    return False
+
+
+def run_streaming_analysis(candle_file=CANDLE_FILE, chunk_rows=CHUNK_ROWS):
+    """
+    Streaming workflow: engulfing and momentum summaries chunk by chunk
+    Peak memory is bounded by chunk_rows instead of the candle file size.
+    Results are appended in input ticker order (hash-bucket order when the
+    input had to be clustered first) rather than sorted by signal.
+    """
+    finviz_df = pd.read_csv(FINVIZ_FILE).drop(columns=['No.'], errors='ignore')
+
+    if not os.path.exists(candle_file):
+        logging.error(f"{candle_file} not found")
+        exit(1)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        # Regroup by ticker first if the input is not already clustered
+        if not is_grouped_by_ticker(candle_file, chunk_rows):
+            logging.info(f"{candle_file} is not grouped by ticker, clustering before streaming")
+            clustered_file = os.path.join(work_dir, 'candles_by_ticker.csv')
+            cluster_by_ticker(candle_file, clustered_file, chunk_rows)
+            candle_file = clustered_file
+
+        # Truncate outputs up front so a run with no results never leaves stale files behind
+        for output_file in (ENGULFING_FILE, MOMENTUM_FILE):
+            open(output_file, 'w').close()
+
+        engulfing_header = momentum_header = True
+        tickers = 0
+        chunks = iter_ticker_chunks(candle_file, chunk_rows)
+        for pattern_df, momentum_df in stream_indicator_tables(chunks):
+            engulfing_header = _append_results(pattern_df, finviz_df, ENGULFING_FILE, engulfing_header)
+            momentum_header = _append_results(momentum_df, finviz_df, MOMENTUM_FILE, momentum_header)
+            tickers += len(pattern_df)
+            logging.info(f"Streamed {tickers} tickers")
+
+    empty_outputs = [f for f, empty in ((ENGULFING_FILE, engulfing_header), (MOMENTUM_FILE, momentum_header)) if empty]
+    if empty_outputs:
+        logging.warning(f"No streaming results written to {' and '.join(empty_outputs)}")
+    else:
+        logging.info(f"Saved streaming results to {ENGULFING_FILE} and {MOMENTUM_FILE}")
+
+# === MAIN ENTRY POINT ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Out-of-core engulfing and momentum analysis")
+    parser.add_argument('--candles', default=CANDLE_FILE, help="Candle CSV to stream")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help="Candle rows read per chunk")
+    args = parser.parse_args()
+
+    run_streaming_analysis(args.candles, args.chunk_rows)
@@ -0,0 +1,177 @@
+import pandas as pd
+import numpy as np
+import argparse
+import logging
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Configuration
+CANDLE_FILE = 'saved_data/stock_candles_90d.csv'
+REPORT_FILE = 'saved_data/stock_candles_quality_report.csv'
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+# Day-over-day close ratios this close to a common split factor are flagged as suspected splits
+SPLIT_FACTORS = [2, 3, 4, 5, 8, 10, 15, 20]
+SPLIT_TOLERANCE = 0.02
+
+# yfinance candles are already split-adjusted (auto_adjust=True), so a matching
+# jump is usually a real move; only back-adjust when explicitly asked to
+ADJUST_SPLITS = False
+
+# === FUNCTIONS (importable) ===
+
+def _split_factor(ratio):
+    """Return the signed split factor a close ratio matches, or 0 if none"""
+    factors = np.array(SPLIT_FACTORS, dtype=float)
+    ratio = np.asarray(ratio, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        forward = np.abs(ratio[:, None] * factors - 1) <= SPLIT_TOLERANCE    # Price divided (forward split)
+        reverse = np.abs(ratio[:, None] / factors - 1) <= SPLIT_TOLERANCE    # Price multiplied (reverse split)
+    result = np.zeros(len(ratio))
+    result = np.where(forward.any(axis=1), factors[forward.argmax(axis=1)], result)
+    result = np.where(reverse.any(axis=1), -factors[reverse.argmax(axis=1)], result)
+    return result
+
+
+def validate_candles(stock_data, adjust_splits=ADJUST_SPLITS):
+    """
+    Validate and clean the candle panel in one vectorized pass
+
+    Flags all-NaN tickers, partial gaps, non-positive prices, High < Low
+    rows and suspected split jumps, then prunes or repairs them:
+      - all-NaN tickers are dropped
+      - rows with missing or non-positive prices are blanked as gaps
+      - High/Low are rebuilt as the envelope of Open/High/Low/Close
+      - interior gaps (with real bars on both sides) become flat candles at
+        the previous close with zero volume and Imputed=True; leading and
+        trailing gaps are dropped, so the latest bar is always a real one
+      - an existing Imputed column is kept, so re-running on cleaned output
+        does not relabel earlier imputed rows as real
+      - suspected splits are only reported, unless adjust_splits is set,
+        in which case earlier prices are back-adjusted by the split factor
+
+    Returns: (cleaned DataFrame, per-ticker quality report DataFrame)
+    """
+    df = stock_data.sort_values(['Ticker', 'Date']).reset_index(drop=True)
+    tickers = df['Ticker']
+    prices = df[PRICE_COLUMNS]
+
+    # Row-level flags computed once over the whole panel
+    flags = pd.DataFrame({
+        'Ticker': tickers,
+        'missing': prices.isna().any(axis=1),
+        'non_positive': (prices <= 0).any(axis=1),
+        'high_below_low': df['High'] < df['Low'],
+    })
+
+    # Blank rows with missing or non-positive prices so they are filled as a whole candle
+    df[PRICE_COLUMNS] = prices.where((prices > 0).all(axis=1), axis=0)
+
+    # Repair High < Low (and Open/Close outside the range) with the candle envelope
+    df['High'] = df[PRICE_COLUMNS].max(axis=1, skipna=False)
+    df['Low'] = df[PRICE_COLUMNS].min(axis=1, skipna=False)
+
+    # Suspected splits: open and close both jump from the prior close by the same split factor
+    prev_close = df.groupby('Ticker', sort=False)['Close'].shift(1).groupby(tickers, sort=False).ffill()
+    factor = _split_factor(df['Close'] / prev_close)
+    factor = np.where(_split_factor(df['Open'] / prev_close) == factor, factor, 0)
+    flags['split_jump'] = factor != 0
+
+    # Opt-in back-adjustment of bars before each split: scale by the product of later factors
+    if adjust_splits:
+        with np.errstate(divide='ignore'):
+            scale = np.where(factor > 0, 1 / factor, np.where(factor < 0, -factor, 1.0))
+        scale = pd.Series(scale, index=df.index)
+        later_scale = (
+            scale[::-1].groupby(tickers[::-1], sort=False).cumprod()[::-1]
+            / scale
+        )
+        df[PRICE_COLUMNS] = df[PRICE_COLUMNS].mul(later_scale, axis=0)
+        if 'Volume' in df.columns:
+            df['Volume'] = df['Volume'].div(later_scale, axis=0)
+
+    # Per-ticker report from the row flags
+    report = flags.groupby('Ticker', sort=False).agg(
+        Rows=('missing', 'size'),
+        Missing_Rows=('missing', 'sum'),
+        Non_Positive_Rows=('non_positive', 'sum'),
+        High_Below_Low_Rows=('high_below_low', 'sum'),
+        Split_Jumps=('split_jump', 'sum'),
+    )
+    report['All_NaN'] = report['Missing_Rows'] == report['Rows']
+    report['Missing_Dates'] = df['Date'].nunique() - report['Rows']
+
+    # Trailing gaps have no real bar after them; they are dropped, not filled
+    has_later_bar = df.groupby('Ticker', sort=False)['Close'].bfill().notna()
+    flags['trailing_gap'] = ~has_later_bar & ~tickers.map(report['All_NaN'])
+    report['Trailing_Gap_Rows'] = flags.groupby('Ticker', sort=False)['trailing_gap'].sum()
+
+    # Prune all-NaN tickers, leading and trailing gaps; interior gaps become flat, zero-volume candles
+    df = df[has_later_bar].copy()
+    previously_imputed = (
+        df['Imputed'].fillna(False).astype(bool) if 'Imputed' in df.columns
+        else pd.Series(False, index=df.index)
+    )
+    newly_imputed = df['Close'].isna()
+    last_close = df.groupby('Ticker', sort=False)['Close'].ffill()
+    for col in PRICE_COLUMNS:
+        df[col] = df[col].fillna(last_close)
+    if 'Volume' in df.columns:
+        df.loc[newly_imputed, 'Volume'] = 0
+    df['Imputed'] = previously_imputed | newly_imputed
+    df = df.dropna(subset=PRICE_COLUMNS).reset_index(drop=True)
+
+    clean = df.groupby('Ticker', sort=False)
+    report['Clean_Rows'] = clean.size().reindex(report.index, fill_value=0)
+    report['Imputed_Rows'] = clean['Imputed'].sum().reindex(report.index, fill_value=0)
+    report['Status'] = np.select(
+        [report['All_NaN'],
+         (report['Split_Jumps'] > 0) & (not adjust_splits),
+         report[['Missing_Rows', 'Non_Positive_Rows', 'High_Below_Low_Rows', 'Split_Jumps', 'Imputed_Rows']].any(axis=1)],
+        ['Pruned', 'Suspect_Split', 'Repaired'],
+        default='OK'
+    )
+
+    return df, report.reset_index()
+
+
+def run_candle_validation(adjust_splits=ADJUST_SPLITS):
+    """Main validation workflow"""
+    # Load stock candle data
+    try:
+        stock_data = pd.read_csv(CANDLE_FILE)
+        stock_data['Date'] = pd.to_datetime(stock_data['Date'])
+    except FileNotFoundError:
+        logging.error(f"{CANDLE_FILE} not found")
+        exit(1)
+
+    clean_df, report_df = validate_candles(stock_data, adjust_splits)
+
+    status_counts = report_df['Status'].value_counts()
+    logging.info(
+        f"Validated {len(report_df)} tickers: "
+        f"{status_counts.get('OK', 0)} OK, "
+        f"{status_counts.get('Repaired', 0)} repaired, "
+        f"{status_counts.get('Suspect_Split', 0)} suspect splits, "
+        f"{status_counts.get('Pruned', 0)} pruned"
+    )
+
+    # Save cleaned candles in place and the quality report alongside them
+    clean_df['Date'] = clean_df['Date'].dt.strftime('%Y-%m-%d')
+    clean_df.to_csv(CANDLE_FILE, index=False)
+    report_df.to_csv(REPORT_FILE, index=False)
+    logging.info(f"Saved {len(clean_df)} rows to {CANDLE_FILE}")
+    logging.info(f"Saved data-quality report to {REPORT_FILE}")
+
+# === MAIN ENTRY POINT ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate and clean the candle file")
+    parser.add_argument('--adjust-splits', action='store_true',
+                        help="Back-adjust prices before suspected splits instead of only flagging them")
+    args = parser.parse_args()
+
+    run_candle_validation(args.adjust_splits)